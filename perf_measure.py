@@ -1,48 +1,144 @@
+import functools
+import math
+
 import pandas as pd
 import numpy as np
+from numba import njit, prange
+
+# hoisted so the annualisation factor is not recomputed on every call
+_SQRT_252 = math.sqrt(252.0)
+
+@functools.lru_cache(maxsize=32)
+def _rf_daily(rf_annual: float) -> float:
+    return (1.0 + rf_annual) ** (1.0 / 252.0) - 1.0
+
+@njit(cache=True, fastmath=True)
+def _fused_stats(returns, portfolio_value, mar):
+    # one streaming pass for every running sum the metrics need, instead of
+    # a separate scan per reduction
+    n = returns.size
+    total = 0.0
+    total_sq = 0.0
+    downside_sq = 0.0
+    for i in range(n):
+        r = returns[i]
+        total += r
+        total_sq += r * r
+        d = r - mar
+        if d < 0.0:
+            downside_sq += d * d
+    mean = total / n
+    std = math.sqrt((total_sq - n * mean * mean) / (n - 1))
+
+    running_max = portfolio_value[0]
+    max_dd = 0.0
+    for i in range(portfolio_value.size):
+        v = portfolio_value[i]
+        if v > running_max:
+            running_max = v
+        dd = (v - running_max) / running_max
+        if dd < max_dd:
+            max_dd = dd
 
-class performance_metrics():
+    return mean, std, downside_sq, n, max_dd
 
-    def __init__(self, df: pd.DataFrame(), portfolio_value_col_name: str, index_col_name: str):
+@njit(cache=True, parallel=True)
+def _batch_metrics(values, returns, mar, rf_daily):
+    # one fused scan per strategy row, strategies spread across cores
+    m = values.shape[0]
+    out = np.empty((m, 5), dtype=np.float64)
+    for i in prange(m):
+        mean, std, downside_sq, n, max_dd = _fused_stats(returns[i], values[i], mar)
+        out[i, 0] = math.log(values[i, -1] / values[i, 0]) * 252.0 / values.shape[1]
+        out[i, 1] = std * _SQRT_252
+        out[i, 2] = math.sqrt(downside_sq / n) * _SQRT_252
+        out[i, 3] = (mean - rf_daily) / std * _SQRT_252
+        out[i, 4] = max_dd
+    return out
+
+class PerformanceMetrics():
+
+    def __init__(self, df: pd.DataFrame(), portfolio_value_col_name: str, index_col_name: str,
+                 dtype: np.dtype = np.float64):
         self.df = df
         self.portfolio_value_col_name = portfolio_value_col_name
         self.index_col_name = index_col_name
+        # float32 halves the memory traffic of the fused scan and is plenty of
+        # precision for these aggregate statistics; GeR stays float64 since it
+        # only touches a handful of yearly boundary values anyway
+        self.dtype = dtype
+        self._stats_cache = {}
     
-    def _year_start_helper(self, series) -> list[str]:
+    def _stats(self, mar: float = 0.0) -> tuple:
+
+        portfolio_value = self.df[self.portfolio_value_col_name]
+        pv = portfolio_value.to_numpy(dtype=self.dtype)
+
+        # cheap fingerprint so back-to-back metric calls on the same series
+        # share one scan instead of four
+        key = (pv.ctypes.data, pv.size, float(pv[0]), float(pv[-1]), mar)
+        cached = self._stats_cache.get(key)
+        if cached is None:
+            returns = portfolio_value.pct_change().dropna().to_numpy(dtype=self.dtype)
+            cached = self._stats_cache[key] = _fused_stats(returns, pv, mar)
+
+        return cached
+
+    def annualised_downside_vol(self, mar: float = 0.0) -> float:
+
+        _, _, downside_sq, n, _ = self._stats(mar)
+
+        return float(math.sqrt(downside_sq / n) * _SQRT_252)
+
+    def annualised_vol(self) -> float:
+
+        _, std, _, _, _ = self._stats()
+
+        return float(std * _SQRT_252)
+
+    def annualised_sharpe_ratio(self, risk_free_annual: float = 0.0) -> float:
 
-        tmp = series.copy().reset_index()
-        res = tmp.groupby(tmp[self.index_col_name].dt.year)[self.index_col_name].min().tolist()
+        mean, std, _, _, _ = self._stats()
 
-        return res[1:]
+        # subtracting a constant leaves the standard deviation unchanged, so
+        # std of the raw returns is the correct denominator here
+        return float((mean - _rf_daily(risk_free_annual)) / std * _SQRT_252)
 
-    def _year_end_helper(self, series) -> list[str]:
+    def maximum_drawdown(self) -> float:
 
-        tmp = series.copy().reset_index()
-        res = tmp.groupby(tmp[self.index_col_name].dt.year)[self.index_col_name].max().tolist()
+        _, _, _, _, max_dd = self._stats()
 
-        return res[1:-1]
+        return float(max_dd)
 
     def GeR_metric(self) -> float:
 
-        tmp = self.df[self.portfolio_value_col_name].copy()
-        year_start = self._year_start_helper(tmp)
-        year_end = self._year_end_helper(tmp)
+        portfolio_value = self.df[self.portfolio_value_col_name]
 
-        tmp = tmp[tmp.index.isin(year_start) | tmp.index.isin(year_end)][:-1].to_frame()
+        # the index is sorted, so year boundaries are just the positions where
+        # the year changes - an adjacency comparison beats a hash groupby
+        values = portfolio_value.to_numpy()
+        years = portfolio_value.index.year.to_numpy()
+        new_year = years[1:] != years[:-1]
 
-        start_PV = []
-        end_PV = []
+        # first/last value of each calendar year, dropping the partial first
+        # and last years as before
+        start_PV = values[np.flatnonzero(np.r_[True, new_year])][1:-1]
+        end_PV = values[np.flatnonzero(np.r_[new_year, True])][1:-1]
 
-        for date in tmp.index:
-            if date.month == 1:
-                start_PV.append(tmp.loc[date][0])
-            else:
-                end_PV.append(tmp.loc[date][0])
+        # log1p of the yearly return is slightly more stable than log(end/start)
+        # when the yearly moves are small
+        GeR = float(np.log1p((end_PV - start_PV) / start_PV).mean())
 
-        res = pd.DataFrame(index=range(2012,2020))
-        res[["start_pv","end_pv"]] = pd.Series([start_PV,end_PV])
-        res["log_return"] = res.apply(lambda x : np.log(x["end_pv"] / x["start_pv"]), axis=1)
+        return GeR
 
-        GeR = res["log_return"].sum() / len(res)
+    def compute_all(self, portfolio_values: np.ndarray, portfolio_returns: np.ndarray,
+                    mar: float = 0.0, risk_free_annual: float = 0.0) -> np.ndarray:
 
-        return GeR
\ No newline at end of file
+        # batched scoring for parameter sweeps: one (M, N) array of portfolio
+        # values/returns in, one (M, 5) array out with columns
+        # (geometric return p.a., vol, downside vol, sharpe, max drawdown);
+        # without a DatetimeIndex the geometric return is annualised by
+        # trading-day count rather than calendar-year boundaries
+        return _batch_metrics(np.ascontiguousarray(portfolio_values),
+                              np.ascontiguousarray(portfolio_returns),
+                              mar, _rf_daily(risk_free_annual))
@@ -0,0 +1,479 @@
+import math
+import os
+
+import numexpr as ne
+import pandas as pd
+import numpy as np
+import yfinance as yf
+from numba import njit
+
+# signal-column kinds shared by the hedge simulation and its kernel
+_ASSET_BUY, _ASSET_SELL, _HEDGE_LONG_BUY, _HEDGE_SHORT_BUY, _HEDGE_SELL = range(5)
+
+@njit(cache=True)
+def _lsv_strategy_kernel(long_buy, long_sell, short_buy, short_sell, initial_capital):
+    # asset codes: 0 = long-vol asset, 1 = short-vol asset, -1 = no position
+    n = long_buy.size
+    asset_codes = np.full(n, -1, dtype=np.int8)
+    quantities = np.empty(n, dtype=np.float64)
+    cash_history = np.empty(n, dtype=np.float64)
+
+    current_asset = -1
+    asset_quantity = 0.0
+    available_cash = initial_capital
+
+    for i in range(n):
+        # close the open position first so the sale proceeds fund the new one
+        if current_asset == 0 and not math.isnan(long_sell[i]):
+            available_cash += asset_quantity * long_sell[i]
+            asset_quantity = 0.0
+            current_asset = -1
+        elif current_asset == 1 and not math.isnan(short_sell[i]):
+            available_cash += asset_quantity * short_sell[i]
+            asset_quantity = 0.0
+            current_asset = -1
+
+        # only open when flat: if a desynced signal left the previous close
+        # unexecuted (NaN sell price), keep the held position instead of
+        # silently overwriting it with a new buy
+        if current_asset == -1:
+            if not math.isnan(long_buy[i]):
+                asset_quantity = math.floor(available_cash / long_buy[i] * 100.0) * 0.01
+                available_cash -= asset_quantity * long_buy[i]
+                current_asset = 0
+            elif not math.isnan(short_buy[i]):
+                asset_quantity = math.floor(available_cash / short_buy[i] * 100.0) * 0.01
+                available_cash -= asset_quantity * short_buy[i]
+                current_asset = 1
+
+        asset_codes[i] = current_asset
+        quantities[i] = asset_quantity
+        cash_history[i] = available_cash
+
+    return asset_codes, quantities, cash_history
+
+@njit(cache=True)
+def _returns_kernel(pv):
+    # daily and cumulative returns fused into one read of the portfolio
+    # series, instead of separate shifted-division and rebase passes
+    n = pv.size
+    returns = np.empty(n, dtype=np.float64)
+    cumulative = np.empty(n, dtype=np.float64)
+    returns[0] = np.nan
+    cumulative[0] = 0.0
+    inv_start = 1.0 / pv[0]
+    for i in range(1, n):
+        returns[i] = pv[i] / pv[i - 1] - 1.0
+        cumulative[i] = pv[i] * inv_start - 1.0
+    return returns, cumulative
+
+@njit(cache=True)
+def _hlsv_strategy_kernel(n, event_day, event_kind, event_col, event_price,
+                          initial_capital, hedge_allocation):
+    # walks a compact event list (day, kind, column, price) holding only the
+    # non-NaN signal cells, sorted by day then column; position state is the
+    # column index of the last buy (-1 = flat) and the wrapper maps the
+    # indices back to asset names
+    asset_cols = np.full(n, -1, dtype=np.int8)
+    hedge_cols = np.full(n, -1, dtype=np.int8)
+    asset_quantities = np.empty(n, dtype=np.float64)
+    hedge_quantities = np.empty(n, dtype=np.float64)
+    cash_history = np.empty(n, dtype=np.float64)
+
+    current_asset_col = -1
+    current_hedge_col = -1
+    asset_quantity = 0.0
+    hedge_quantity = 0.0
+    available_cash = initial_capital
+
+    m = event_day.size
+    e = 0
+    for i in range(n):
+        start = e
+        while e < m and event_day[e] == i:
+            e += 1
+
+        if e > start:
+            # close both legs first so the proceeds fund the new positions
+            for t in range(start, e):
+                price = event_price[t]
+                if event_kind[t] == _HEDGE_SELL:
+                    available_cash += hedge_quantity * price
+                    hedge_quantity = 0.0
+                    current_hedge_col = -1
+                elif event_kind[t] == _ASSET_SELL:
+                    available_cash += asset_quantity * price
+                    asset_quantity = 0.0
+                    current_asset_col = -1
+
+            # split the freed-up cash between the volatility and hedge legs
+            vix_budget = available_cash * (1.0 - hedge_allocation)
+            hedge_budget = available_cash * hedge_allocation
+
+            # each leg only opens when flat: if a desynced signal left the
+            # close unexecuted (NaN sell price), keep the held position
+            # instead of silently overwriting it with a new buy
+            for t in range(start, e):
+                price = event_price[t]
+                if event_kind[t] == _HEDGE_LONG_BUY and current_hedge_col == -1:
+                    quantity = math.floor(hedge_budget / price * 100.0) * 0.01
+                    hedge_quantity = quantity
+                    available_cash -= quantity * price
+                    current_hedge_col = event_col[t]
+                elif event_kind[t] == _HEDGE_SHORT_BUY and current_hedge_col == -1:
+                    # a short hedge is carried as a negative quantity; opening
+                    # it adds the sale proceeds to cash, closing buys them back
+                    quantity = math.floor(hedge_budget / price * 100.0) * 0.01
+                    hedge_quantity = -quantity
+                    available_cash += quantity * price
+                    current_hedge_col = event_col[t]
+                elif event_kind[t] == _ASSET_BUY and current_asset_col == -1:
+                    asset_quantity = math.floor(vix_budget / price * 100.0) * 0.01
+                    available_cash -= asset_quantity * price
+                    current_asset_col = event_col[t]
+
+        asset_cols[i] = current_asset_col
+        hedge_cols[i] = current_hedge_col
+        asset_quantities[i] = asset_quantity
+        hedge_quantities[i] = hedge_quantity
+        cash_history[i] = available_cash
+
+    return asset_cols, hedge_cols, asset_quantities, hedge_quantities, cash_history
+
+class TradingStrategies():
+
+    def __init__(self, volatility_assets: list[str], volatility_indices: list[str],
+                 start_date: str, end_date: str, price_dtype: np.dtype = np.float32):
+        self.volatility_assets = volatility_assets
+        self.volatility_indices = volatility_indices
+        self.start_date = start_date
+        self.end_date = end_date
+        self.data = None
+        # OHLC prices carry ~5 significant digits, so float32 is plenty for
+        # the signal/strategy kernels and halves the bytes per scan; cash and
+        # portfolio values stay float64 downstream
+        self.price_dtype = price_dtype
+        self._price_matrix = None
+        self._col_index = None
+        self._basis_cache = {}
+
+    def get_data(self, manual_upload: pd.DataFrame = None, col_rename: str = None) -> pd.DataFrame:
+
+        yf_data = self.__get_data_tickers_list(self.volatility_indices + self.volatility_assets,
+                                               self.start_date, self.end_date)
+
+        # no library to get futures data - joined from a manually downloaded
+        # csv; the csv carries holiday and weekend rows yfinance never
+        # returns, so align it to the downloaded trading calendar first
+        # (left-join semantics) - an outer join would insert rows where every
+        # equity price is NaN and corrupt the signal generation downstream
+        if manual_upload is not None:
+            futures_open = manual_upload["Open"].reindex(yf_data.index)
+            self.data = pd.concat([yf_data, futures_open], axis=1)
+            self.data.rename(columns={"Open": col_rename}, inplace=True)
+        else:
+            self.data = yf_data
+
+        # contiguous copy of all price columns plus a name -> column map; the
+        # hot paths index this matrix instead of probing the BlockManager and
+        # rebuilding a Series per column lookup
+        self._price_matrix = self.data.to_numpy(dtype=self.price_dtype)
+        self._col_index = {col: i for i, col in enumerate(self.data.columns)}
+        self._basis_cache = {}
+
+        return self.data
+
+    def __get_data_tickers_list(self, tickers_list: list[str], start_date: str,
+                                end_date: str, cache_dir: str = ".yf_cache") -> pd.DataFrame:
+
+        # warm reruns (parameter sweeps, notebook restarts) skip the network
+        # entirely and load the assembled frame from disk; pickle rather than
+        # parquet so no extra IO dependency is needed
+        cache_key = "_".join(ticker.lstrip("^").lower() for ticker in tickers_list)
+        cache_path = os.path.join(cache_dir, f"{cache_key}_{start_date}_{end_date}.pkl")
+        if os.path.exists(cache_path):
+            return pd.read_pickle(cache_path)
+
+        # one multiplexed download for all tickers - yfinance fetches them on
+        # its own thread pool, so wall time is ~one round-trip instead of one
+        # per ticker
+        raw = yf.download(tickers_list, start=start_date, end=end_date,
+                          group_by="ticker", threads=True, auto_adjust=False)
+
+        frames = []
+
+        for ticker in tickers_list:
+            name = ticker.lstrip("^").lower()
+            if ticker in self.volatility_indices:
+                hist_price_df = raw[ticker]["Open"].to_frame()
+                hist_price_df.columns = [f"{name}_spot_open"]
+            else:
+                hist_price_df = raw[ticker][["Open", "Close"]].copy()
+                hist_price_df.columns = [f"{name}_open", f"{name}_close"]
+
+            frames.append(hist_price_df)
+
+        # all frames share the same DatetimeIndex, so a single block concat
+        # replaces the old grow-by-merge accumulator
+        stock_data_df = pd.concat(frames, axis=1, join="outer")
+
+        # newer yfinance versions return a tz-aware index; the futures csv is
+        # tz-naive, so strip the timezone if there is one - a naive index can
+        # simply be left alone. tz_localize keeps the exchange-local date;
+        # tz_convert would shift midnight New York to 04:00/05:00 UTC and
+        # misalign every row
+        if stock_data_df.index.tz is not None:
+            stock_data_df.index = stock_data_df.index.tz_localize(None)
+
+        os.makedirs(cache_dir, exist_ok=True)
+        stock_data_df.to_pickle(cache_path)
+
+        return stock_data_df
+
+    def __price_col(self, col_name: str) -> np.ndarray:
+
+        return self._price_matrix[:, self._col_index[col_name]]
+
+    def __daily_basis(self, vol_future_ticker: str, vol_spot_ticker: str) -> np.ndarray:
+
+        # every signal generator recomputes the same basis in typical usage,
+        # so cache the array per (future, spot) pair; refreshed by get_data
+        key = (vol_future_ticker, vol_spot_ticker)
+        basis = self._basis_cache.get(key)
+        if basis is None:
+            # If basis is negative then term structure is backwardation.
+            # If basis is positive, then term structure is contango.
+            # one vectorized division straight off the price matrix
+            basis = self.__price_col(vol_future_ticker) / self.__price_col(vol_spot_ticker) - 1.0
+            self.data["basis"] = basis
+            self._basis_cache[key] = basis
+
+        return basis
+
+    def __extract_asset_name(self, signal_string: str):
+
+        # a fixed-suffix strip beats firing up the regex engine in the loops
+        if signal_string.endswith(("_sell_signal", "_buy_signal")):
+            return signal_string.removesuffix("_sell_signal").removesuffix("_buy_signal")
+
+        return None
+
+    def __lsv_signals(self, long_vix_asset: str, short_vix_asset: str,
+                      vol_future_ticker: str, vol_spot_ticker: str) -> pd.DataFrame:
+
+        basis = self.__daily_basis(vol_future_ticker, vol_spot_ticker)
+        long_open = self.__price_col(f"{long_vix_asset}_open")
+        short_open = self.__price_col(f"{short_vix_asset}_open")
+
+        # the state machine only flips position on a sign change of the basis,
+        # so the held side equals the current sign and trades happen exactly at
+        # the transitions - no per-row Python loop needed
+        want_long = basis < 0
+        flip = np.r_[True, want_long[1:] != want_long[:-1]]
+
+        n = basis.size
+        signals = {f"{long_vix_asset}_buy_signal": np.full(n, np.nan),
+                   f"{long_vix_asset}_sell_signal": np.full(n, np.nan),
+                   f"{short_vix_asset}_buy_signal": np.full(n, np.nan),
+                   f"{short_vix_asset}_sell_signal": np.full(n, np.nan)}
+
+        open_long = flip & want_long
+        open_short = flip & ~want_long
+        signals[f"{long_vix_asset}_buy_signal"][open_long] = long_open[open_long]
+        signals[f"{short_vix_asset}_buy_signal"][open_short] = short_open[open_short]
+
+        # the opposite side is closed on the same day it flips, except on the
+        # very first row where no prior position exists
+        close_long = open_short.copy()
+        close_long[0] = False
+        close_short = open_long.copy()
+        close_short[0] = False
+        signals[f"{long_vix_asset}_sell_signal"][close_long] = long_open[close_long]
+        signals[f"{short_vix_asset}_sell_signal"][close_short] = short_open[close_short]
+
+        return pd.DataFrame(signals, index=self.data.index)
+
+    def __hlsv_signals(self, long_vix_asset: str, short_vix_asset: str, hedge_asset: str,
+                       vol_future_ticker: str, vol_spot_ticker: str) -> pd.DataFrame:
+
+        basis = self.__daily_basis(vol_future_ticker, vol_spot_ticker)
+        long_vix_open = self.__price_col(f"{long_vix_asset}_open")
+        short_vix_open = self.__price_col(f"{short_vix_asset}_open")
+        hedge_open = self.__price_col(f"{hedge_asset}_open")
+
+        # same two-state machine as the LSV signals, just with a hedge leg
+        # traded alongside each volatility leg on the transition days
+        want_long = basis < 0
+        flip = np.r_[True, want_long[1:] != want_long[:-1]]
+
+        asset_signals = [f"{long_vix_asset}_buy_signal", f"{long_vix_asset}_sell_signal",
+                         f"{short_vix_asset}_buy_signal", f"{short_vix_asset}_sell_signal",
+                         f"{hedge_asset}_long_buy_signal", f"{hedge_asset}_long_sell_signal",
+                         f"{hedge_asset}_short_buy_signal", f"{hedge_asset}_short_sell_signal"]
+        signals = {signal: np.full(basis.size, np.nan) for signal in asset_signals}
+
+        # If basis is negative - long volatility hedged with a long hedge leg;
+        # if the basis is positive - short volatility hedged with a short hedge leg
+        open_long = flip & want_long
+        open_short = flip & ~want_long
+        close_long = open_short.copy()
+        close_long[0] = False
+        close_short = open_long.copy()
+        close_short[0] = False
+
+        signals[f"{long_vix_asset}_buy_signal"][open_long] = long_vix_open[open_long]
+        signals[f"{hedge_asset}_long_buy_signal"][open_long] = hedge_open[open_long]
+        signals[f"{short_vix_asset}_buy_signal"][open_short] = short_vix_open[open_short]
+        signals[f"{hedge_asset}_short_buy_signal"][open_short] = hedge_open[open_short]
+        signals[f"{long_vix_asset}_sell_signal"][close_long] = long_vix_open[close_long]
+        signals[f"{hedge_asset}_long_sell_signal"][close_long] = hedge_open[close_long]
+        signals[f"{short_vix_asset}_sell_signal"][close_short] = short_vix_open[close_short]
+        signals[f"{hedge_asset}_short_sell_signal"][close_short] = hedge_open[close_short]
+
+        return pd.DataFrame(signals, index=self.data.index)
+
+    def lsv_strategy(self, initial_capital: float, long_vix_asset: str = "vixy",
+                     short_vix_asset: str = "svxy", vol_future_ticker: str = "vix_future_open",
+                     vol_spot_ticker: str = "vix_spot_open") -> pd.DataFrame:
+
+        signals_df = self.__lsv_signals(long_vix_asset, short_vix_asset,
+                                        vol_future_ticker, vol_spot_ticker)
+
+        asset_codes, quantity_history, cash_history = _lsv_strategy_kernel(
+            signals_df[f"{long_vix_asset}_buy_signal"].to_numpy(),
+            signals_df[f"{long_vix_asset}_sell_signal"].to_numpy(),
+            signals_df[f"{short_vix_asset}_buy_signal"].to_numpy(),
+            signals_df[f"{short_vix_asset}_sell_signal"].to_numpy(),
+            initial_capital)
+
+        # map the int8 codes back to asset names; code -1 (flat) picks up the
+        # trailing None through negative indexing
+        code_to_asset = np.array([long_vix_asset, short_vix_asset, None], dtype=object)
+        asset_history = code_to_asset[asset_codes]
+
+        res = pd.DataFrame(index=signals_df.index)
+        res["asset_history"] = asset_history
+        res["asset_quantity"] = quantity_history
+        res["available_cash"] = cash_history
+
+        # one vectorized gather from the stacked close columns instead of a
+        # label-based .loc lookup per row; flat rows (code -1) hold nothing,
+        # so their close price is masked to NaN and their asset value to
+        # zero, mirroring the sentinel handling in hlsv_strategy
+        close_prices = np.column_stack((self.__price_col(f"{long_vix_asset}_close"),
+                                        self.__price_col(f"{short_vix_asset}_close")))
+        held = asset_codes >= 0
+        gathered = close_prices[np.arange(len(res)), np.maximum(asset_codes, 0)]
+        res["asset_close_price"] = np.where(held, gathered, np.nan)
+        res["portfolio_value"] = np.where(held, gathered * quantity_history, 0.0) + cash_history
+        returns, cumulative = _returns_kernel(res["portfolio_value"].to_numpy())
+        res["portfolio_returns"] = returns
+        res["portfolio_cumulative_returns"] = cumulative
+
+        return res
+
+    def hlsv_strategy(self, initial_capital: float, hedge_allocation: float = 0.5,
+                      long_vix_asset: str = "vixy", short_vix_asset: str = "svxy",
+                      hedge_asset: str = "spy", vol_future_ticker: str = "vix_future_open",
+                      vol_spot_ticker: str = "vix_spot_open") -> pd.DataFrame:
+
+        signals_df = self.__hlsv_signals(long_vix_asset, short_vix_asset, hedge_asset,
+                                         vol_future_ticker, vol_spot_ticker)
+
+        # classify each signal column once so the kernel dispatches on an
+        # int kind rather than string tests per event
+        col_names = list(signals_df.columns)
+        kinds = np.empty(len(col_names), dtype=np.int8)
+        col_assets = []
+        for j, col in enumerate(col_names):
+            if col == f"{hedge_asset}_long_buy_signal":
+                kinds[j] = _HEDGE_LONG_BUY
+                col_assets.append(f"{hedge_asset}_long")
+            elif col == f"{hedge_asset}_short_buy_signal":
+                kinds[j] = _HEDGE_SHORT_BUY
+                col_assets.append(f"{hedge_asset}_short")
+            elif col.startswith(hedge_asset):
+                kinds[j] = _HEDGE_SELL
+                col_assets.append(None)
+            elif col.endswith("_buy_signal"):
+                kinds[j] = _ASSET_BUY
+                col_assets.append(self.__extract_asset_name(col))
+            else:
+                kinds[j] = _ASSET_SELL
+                col_assets.append(None)
+
+        # struct-of-arrays event list: >90% of the signal matrix is NaN, so
+        # the kernel scans only the populated cells (np.nonzero walks the
+        # matrix row-major, keeping events sorted by day then column)
+        signal_matrix = signals_df.to_numpy()
+        rows, cols = np.nonzero(~np.isnan(signal_matrix))
+        event_day = rows.astype(np.int32)
+        event_col = cols.astype(np.int8)
+        event_kind = kinds[cols]
+        event_price = signal_matrix[rows, cols].astype(np.float64)
+
+        (asset_cols, hedge_cols, asset_quantity_history,
+         hedge_quantity_history, cash_history) = _hlsv_strategy_kernel(
+            len(signals_df), event_day, event_kind, event_col, event_price,
+            initial_capital, hedge_allocation)
+
+        # map the buy-column indices back to names; index -1 (flat) picks up
+        # the trailing None through negative indexing
+        col_asset_lookup = np.array(col_assets + [None], dtype=object)
+        asset_history = col_asset_lookup[asset_cols]
+        hedge_history = col_asset_lookup[hedge_cols]
+
+        res = pd.DataFrame(index=signals_df.index)
+        # a handful of distinct names across thousands of rows: categoricals
+        # carry one small integer code per row instead of an object pointer,
+        # and expose the distinct names directly for the price gather below
+        asset_history = pd.Categorical(asset_history)
+        hedge_history = pd.Categorical(hedge_history)
+        res["asset_history"] = asset_history
+        res["hedge_history"] = hedge_history
+        res["asset_quantity"] = asset_quantity_history
+        res["hedge_quantity"] = hedge_quantity_history
+        res["available_cash"] = cash_history
+
+        # gather from a matrix holding only the close columns, with position
+        # names resolved through one small prefix -> column dict instead of
+        # a string lookup against the full frame; flat rows resolve to -1 and
+        # are zeroed below
+        close_cols = [c for c in self.data.columns if c.endswith("_close")]
+        close_matrix = self.data.loc[res.index, close_cols].to_numpy()
+        prefix_to_col = {c[:-len("_close")]: i for i, c in enumerate(close_cols)}
+        row_idx = np.arange(len(res))
+
+        # resolve the prefix once per category and broadcast through the
+        # categorical codes; the flat rows carry code -1 and pick up the
+        # trailing -1 sentinel via negative indexing
+        def _col_idx(history, prefix_len):
+            per_category = np.array([prefix_to_col.get(c[:prefix_len], -1)
+                                     for c in history.categories] + [-1])
+            return per_category[history.codes]
+
+        asset_col_idx = _col_idx(asset_history, 4)
+        hedge_col_idx = _col_idx(hedge_history, 3)
+
+        asset_value = np.where(
+            asset_col_idx >= 0,
+            close_matrix[row_idx, np.maximum(asset_col_idx, 0)] * asset_quantity_history,
+            0.0)
+        hedge_value = np.where(
+            hedge_col_idx >= 0,
+            close_matrix[row_idx, np.maximum(hedge_col_idx, 0)] * hedge_quantity_history,
+            0.0)
+        res["asset_value"] = asset_value
+        res["hedge_value"] = hedge_value
+        if len(res) > 50_000:
+            # numexpr fuses the three-operand sum into one blocked pass with
+            # no intermediate arrays; below this size its setup cost dominates
+            portfolio_value = ne.evaluate("asset_value + hedge_value + cash_history")
+        else:
+            portfolio_value = asset_value + hedge_value + cash_history
+        res["portfolio_value"] = portfolio_value
+        returns, cumulative = _returns_kernel(res["portfolio_value"].to_numpy())
+        res["portfolio_returns"] = returns
+        res["portfolio_cumulative_returns"] = cumulative
+
+        return res